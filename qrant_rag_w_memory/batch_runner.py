@@ -0,0 +1,190 @@
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List
+from chatbot import RAGChatbot
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class BatchRunner:
+    """Runs many queries from a JSONL file through the RAG pipeline."""
+
+    def __init__(self, chatbot: RAGChatbot, batch_size: int = None, concurrency: int = None):
+        """
+        Initialize the batch runner.
+
+        Args:
+            chatbot (RAGChatbot): Initialized chatbot whose components are reused
+            batch_size (int, optional): Queries per embed/search round. Defaults to Config.BATCH_SIZE.
+            concurrency (int, optional): Concurrent generation requests. Defaults to Config.BATCH_CONCURRENCY.
+        """
+        self.chatbot = chatbot
+        self.batch_size = batch_size or Config.BATCH_SIZE
+        self.concurrency = concurrency or Config.BATCH_CONCURRENCY
+        logger.info(f"Initialized BatchRunner with batch_size: {self.batch_size}, concurrency: {self.concurrency}")
+
+    def read_queries(self, input_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read queries from a JSONL file.
+
+        Each line is an object with a "query" field and an optional "id".
+        Invalid lines are yielded with an "error" field, keeping their own
+        "id" when the line parsed as an object and the line number otherwise.
+
+        Args:
+            input_path (str): Path to the JSONL file
+
+        Yields:
+            Dict[str, Any]: Query items with "id" and "query"
+        """
+        with open(input_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = None
+                try:
+                    record = json.loads(line)
+                    query = record["query"]
+                    if not isinstance(query, str) or not query.strip():
+                        raise ValueError("'query' must be a non-empty string")
+                    yield {"id": record.get("id", line_number), "query": query.strip()}
+                except (ValueError, KeyError, TypeError) as e:
+                    item_id = record.get("id", line_number) if isinstance(record, dict) else line_number
+                    yield {"id": item_id, "query": None, "error": f"Invalid input line {line_number}: {e}"}
+
+    @staticmethod
+    def _timings(embed_ms: float = 0.0, search_ms: float = 0.0, generate_ms: float = 0.0) -> Dict[str, float]:
+        """Build the per-item timings shared by every result record."""
+        return {
+            "embed_ms": round(embed_ms, 2),
+            "search_ms": round(search_ms, 2),
+            "generate_ms": round(generate_ms, 2),
+            "total_ms": round(embed_ms + search_ms + generate_ms, 2)
+        }
+
+    def _generate(self, item: Dict[str, Any], context: str, embed_ms: float, search_ms: float) -> Dict[str, Any]:
+        """
+        Generate the answer for one query and build its result record.
+
+        Args:
+            item (Dict[str, Any]): Query item
+            context (str): Retrieved context for the query
+            embed_ms (float): Per-query share of the batched embedding time
+            search_ms (float): Per-query share of the batched search time
+
+        Returns:
+            Dict[str, Any]: Result record
+        """
+        start = time.perf_counter()
+        try:
+            response = self.chatbot.answer_with_context(item["query"], context)
+            result = {"response": response, "success": True}
+        except Exception as e:
+            logger.error(f"Error generating response for item {item['id']}: {e}")
+            result = {"response": "", "success": False, "error": str(e)}
+        generate_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            "id": item["id"],
+            "query": item["query"],
+            **result,
+            "timings": self._timings(embed_ms, search_ms, generate_ms)
+        }
+
+    def _process_batch(self, items: List[Dict[str, Any]], executor: ThreadPoolExecutor) -> Iterator[Dict[str, Any]]:
+        """
+        Embed and search a batch of queries at once, then generate answers concurrently.
+
+        Args:
+            items (List[Dict[str, Any]]): Valid query items
+            executor (ThreadPoolExecutor): Executor bounding generation concurrency
+
+        Yields:
+            Dict[str, Any]: Result records in completion order
+        """
+        embed_ms = search_ms = 0.0
+        embedded = False
+        start = time.perf_counter()
+        try:
+            query_vectors = self.chatbot.document_processor.embed_queries([item["query"] for item in items])
+            embed_ms = (time.perf_counter() - start) * 1000 / len(items)
+            embedded = True
+
+            start = time.perf_counter()
+            search_results = self.chatbot.vector_store.search_batch(query_vectors, tenant_ids=self.chatbot.corpus_ids)
+            search_ms = (time.perf_counter() - start) * 1000 / len(items)
+        except Exception as e:
+            logger.error(f"Error retrieving context for batch: {e}")
+            # Charge the time spent up to the failure to the stage that failed
+            failed_ms = (time.perf_counter() - start) * 1000 / len(items)
+            if embedded:
+                search_ms = failed_ms
+            else:
+                embed_ms = failed_ms
+            for item in items:
+                yield {
+                    "id": item["id"],
+                    "query": item["query"],
+                    "response": "",
+                    "success": False,
+                    "error": str(e),
+                    "timings": self._timings(embed_ms, search_ms)
+                }
+            return
+
+        futures = [
+            executor.submit(
+                self._generate,
+                item,
+                "\n\n".join(hit["text"] for hit in hits),
+                embed_ms,
+                search_ms
+            )
+            for item, hits in zip(items, search_results)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def run(self, input_path: str, output_path: str) -> Dict[str, Any]:
+        """
+        Run all queries in a JSONL file and stream results to a JSONL file.
+
+        Args:
+            input_path (str): Path to the input JSONL file
+            output_path (str): Path to the output JSONL file
+
+        Returns:
+            Dict[str, Any]: Run summary with counts and elapsed time
+        """
+        logger.info(f"Running batch queries from {input_path} into {output_path}")
+        start = time.perf_counter()
+        summary = {"total": 0, "succeeded": 0, "failed": 0}
+
+        def write(out, record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            summary["total"] += 1
+            summary["succeeded" if record["success"] else "failed"] += 1
+
+        with open(output_path, "w", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            batch = []
+            for item in self.read_queries(input_path):
+                if "error" in item:
+                    write(out, {**item, "response": "", "success": False, "timings": self._timings()})
+                    continue
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    for record in self._process_batch(batch, executor):
+                        write(out, record)
+                    batch = []
+            if batch:
+                for record in self._process_batch(batch, executor):
+                    write(out, record)
+
+        summary["elapsed_s"] = round(time.perf_counter() - start, 2)
+        logger.info(f"Batch run finished: {summary}")
+        return summary
@@ -1,20 +1,39 @@
 import logging
+from pathlib import Path
 from typing import List, Dict, Any
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from config import Config
 from document_processor import DocumentProcessor
 from vector_store import VectorStore
 from memory_manager import MemoryManager
+from profiler import profiled
+from retry_utils import call_with_retry
 import uuid
 
 
 logger = logging.getLogger(__name__)
 
+# Rate limits and transient server errors from the Gemini API
+RETRYABLE_GENERATION_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
 class RAGChatbot:
     """RAG (Retrieval-Augmented Generation) Chatbot."""
     
-    def __init__(self, session_id=None):
-        """Initialize the RAG chatbot."""
+    def __init__(self, session_id=None, conversion_profile: str = None, corpus_ids: List[str] = None):
+        """
+        Initialize the RAG chatbot.
+        
+        Args:
+            session_id (str, optional): Conversation session ID. Defaults to a new UUID.
+            conversion_profile (str, optional): Docling conversion profile. Defaults to Config.CONVERSION_PROFILE.
+            corpus_ids (List[str], optional): Corpora this session searches. Defaults to [Config.DEFAULT_CORPUS].
+        """
         Config.validate()
         
         # Configure Gemini
@@ -22,8 +41,9 @@ class RAGChatbot:
         self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
         
         # Initialize components
-        self.document_processor = DocumentProcessor()
-        self.vector_store = VectorStore()
+        self.document_processor = DocumentProcessor(conversion_profile=conversion_profile)
+        self.vector_store = VectorStore(tenant_field=Config.CORPUS_FIELD, source_field=Config.SOURCE_FIELD)
+        self.corpus_ids = list(corpus_ids or [Config.DEFAULT_CORPUS])
         #intitialize session and vector store (collection) for memory
         self.session_id = session_id or str(uuid.uuid4())
         self.memory_manager = MemoryManager()
@@ -31,21 +51,37 @@ class RAGChatbot:
 
         logger.info("RAG Chatbot initialized successfully")
     
-    def load_documents(self, file_path: str):
+    @profiled("load_documents")
+    def load_documents(self, file_path: str, corpus_id: str = None):
         """
         Load and process documents into the vector store.
         
+        Chunks previously indexed from the same files in the same corpus are
+        replaced, so re-ingesting an edited document leaves no stale chunks.
+        
         Args:
-            file_path (str): Path to the document file
+            file_path (str): Path to the document file, or a directory of documents
+            corpus_id (str, optional): Corpus to index into. Defaults to the session's first corpus.
         """
         try:
-            logger.info(f"Loading documents from: {file_path}")
+            corpus_id = corpus_id or self.corpus_ids[0]
+            logger.info(f"Loading documents from: {file_path} into corpus: {corpus_id}")
             
-            # Process document
-            text_chunks, embeddings = self.document_processor.process_document(file_path)
+            # Process document(s)
+            path = Path(file_path)
+            if path.is_dir():
+                file_paths = sorted(
+                    str(p) for p in path.iterdir()
+                    if p.is_file() and self.document_processor.is_supported(str(p))
+                )
+                text_chunks, embeddings, sources = self.document_processor.process_documents(file_paths)
+            else:
+                text_chunks, embeddings = self.document_processor.process_document(file_path)
+                sources = [file_path] * len(text_chunks)
             
-            # Store in vector database
-            self.vector_store.add_documents(text_chunks, embeddings)
+            # Store in vector database, keyed by the absolute path of each source file
+            metas = [{Config.SOURCE_FIELD: Path(source).resolve().as_posix()} for source in sources]
+            self.vector_store.add_documents(text_chunks, embeddings, metas, tenant_id=corpus_id)
             
             logger.info("Documents loaded and indexed successfully")
             
@@ -69,7 +105,7 @@ class RAGChatbot:
             query_vector = self.document_processor.embed_query(effective_query)
             
             # Search for relevant documents
-            doc_results = self.vector_store.search(query_vector, limit)
+            doc_results = self.vector_store.search(query_vector, limit, tenant_ids=self.corpus_ids)
 
             mem_results = self.memory_store.search_with_filter(query_vector, limit, {"session_id": self.session_id, "type": "memory"})
             merged = sorted([{"text": x["text"], "score": x["score"]} for x in doc_results+mem_results],key=lambda x: -x["score"])
@@ -86,8 +122,7 @@ class RAGChatbot:
         if not self.memory_manager.buffer and not self.memory_manager.summary:
             return query
         prompt = self.memory_manager.build_rewrite_prompt(query)
-        response = self.model.generate_content(prompt)
-        result = response.text.strip()
+        result = self._generate_content(prompt)
         return result if result and len(result) > 5 else query
 
 
@@ -121,31 +156,71 @@ Context:
 Question: {query}
 Answer:"""
             
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate_content(prompt)
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             raise
 
+    def _generate_content(self, prompt: str) -> str:
+        """
+        Call Gemini, backing off and retrying on rate limits and transient errors.
+
+        Args:
+            prompt (str): Prompt to send to the model
+
+        Returns:
+            str: Generated text
+        """
+        response = call_with_retry(
+            lambda: self.model.generate_content(prompt),
+            retry_on=RETRYABLE_GENERATION_ERRORS,
+            max_retries=Config.GENERATION_MAX_RETRIES,
+            base_delay=Config.GENERATION_BACKOFF_SECONDS,
+            description="Gemini generation",
+        )
+        return response.text.strip()
+
+    def answer_with_context(self, query: str, context: str) -> str:
+        """
+        Generate a stateless answer from retrieved context only.
+
+        Used by batch mode: conversation summary, history and memory are
+        neither read nor updated, so calls are safe to run concurrently.
+
+        Args:
+            query (str): User query
+            context (str): Retrieved context
+
+        Returns:
+            str: Generated response
+        """
+        prompt = f"""You are a helpful assistant. Use the retrieved context.
+
+Context:
+{context}
+
+Question: {query}
+Answer:"""
+        return self._generate_content(prompt)
+
 
 
     def _update_memory(self, query, answer):
         # Update summary
         prompt = self.memory_manager.build_summary_prompt(query, answer)
-        response = self.model.generate_content(prompt)
-        self.memory_manager.summary = response.text.strip()
+        self.memory_manager.summary = self._generate_content(prompt)
 
         # Extract facts and store
         facts_prompt = self.memory_manager.build_facts_prompt(query, answer)
-        facts_resp = self.model.generate_content(facts_prompt)
+        facts_text = self._generate_content(facts_prompt)
         facts_lines = [
             l.strip("•- ").strip()
-            for l in facts_resp.text.splitlines()
+            for l in facts_text.splitlines()
             if l.strip() and "NONE" not in l.upper()
         ]
         if facts_lines:
-            embeddings = list(self.document_processor.embedding_model.embed(facts_lines))
+            embeddings = self.document_processor.generate_embeddings(facts_lines)
             metas = [{"session_id": self.session_id, "type": "memory"}] * len(facts_lines)
             self.memory_store.add_documents(facts_lines, embeddings, metas)
 
@@ -159,6 +234,7 @@ Answer:"""
 
 
 
+    @profiled("chat")
     def chat(self, query: str) -> Dict[str, Any]:
         """
         Process a chat query and return response with metadata.
@@ -198,6 +274,18 @@ Answer:"""
                 "error": str(e)
             }
     
+    def set_corpora(self, corpus_ids: List[str]):
+        """
+        Select the corpora this session searches.
+        
+        Args:
+            corpus_ids (List[str]): Corpus IDs
+        """
+        if not corpus_ids:
+            raise ValueError("At least one corpus ID is required")
+        self.corpus_ids = list(corpus_ids)
+        logger.info(f"Session {self.session_id} now searching corpora: {self.corpus_ids}")
+    
     def simple_chat(self, query: str) -> str:
         """
         Simple chat interface that returns just the response text.
@@ -223,6 +311,7 @@ Answer:"""
             return {
                 "status": "ready",
                 "collection": collection_info,
+                "corpora": self.corpus_ids,
                 "model": Config.GEMINI_MODEL,
                 "embedding_model": Config.EMBEDDING_MODEL
             }
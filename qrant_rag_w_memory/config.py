@@ -9,20 +9,56 @@ class Config:
     
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     
-    EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")  # Any fastembed model name, including quantized ONNX variants
     CHUNK_TOKENIZER = "sentence-transformers/all-MiniLM-L6-v2"
     GEMINI_MODEL = "gemma-3-27b-it"
     
+    # Embedding runtime settings (tune per host, e.g. ingest vs query nodes)
+    EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS")) if os.getenv("EMBEDDING_THREADS") else None  # ONNX intra-op threads, None lets onnxruntime decide
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 256))  # Texts per ONNX inference call
+    EMBEDDING_PARALLEL = int(os.getenv("EMBEDDING_PARALLEL")) if os.getenv("EMBEDDING_PARALLEL") else None  # Data-parallel workers for ingest, 0 uses all cores, None disables
+    EMBEDDING_PROVIDERS = [p.strip() for p in os.getenv("EMBEDDING_PROVIDERS", "").split(",") if p.strip()] or None  # ONNX execution providers, e.g. "CPUExecutionProvider"
+    
     # Chunking parameters
     MAX_TOKENS = 256
     
+    # Document conversion settings
+    CONVERSION_PROFILE = os.getenv("CONVERSION_PROFILE", "accurate")  # "accurate" or "fast" (no OCR/table structure, for text-native PDFs)
+    DOCLING_CACHE_DIR = os.getenv("DOCLING_CACHE_DIR", ".docling_cache")  # Set to "" to disable the converted-document cache
+    CONVERSION_WORKERS = int(os.getenv("CONVERSION_WORKERS", 1))  # Worker processes for multi-file conversion, each loads its own models
+    
     # Vector store settings
     COLLECTION_NAME = "Simple_RAG_Qdrant"
+    CORPUS_FIELD = "corpus_id"  # Payload field partitioning the document collection by tenant/corpus
+    SOURCE_FIELD = "source"  # Payload field naming the file a chunk came from, replaced on re-ingest
+    DEFAULT_CORPUS = os.getenv("DEFAULT_CORPUS", "default")
     QDRANT_URL = "https://0ad9e58e-aee3-4dda-b368-3807f55273d4.eu-central-1-0.aws.cloud.qdrant.io:6333"  # Use ":memory:" for in-memory, or provide URL for persistent storage
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")    
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes")
+    QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", 10))  # Seconds per request
+    QDRANT_MAX_RETRIES = int(os.getenv("QDRANT_MAX_RETRIES", 3))
+    QDRANT_BACKOFF_SECONDS = float(os.getenv("QDRANT_BACKOFF_SECONDS", 0.5))
+    UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", 256))  # Points per upload request
+    UPLOAD_PARALLEL = int(os.getenv("UPLOAD_PARALLEL", 1))  # Upload worker processes
     # Search parameters
     RETRIEVAL_LIMIT = 4
     
+    # Batch mode parameters
+    BATCH_SIZE = int(os.getenv("BATCH_SIZE", 64))  # Queries embedded and searched per round trip
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))  # Concurrent generation requests
+    
+    # Generation retry parameters
+    GENERATION_MAX_RETRIES = int(os.getenv("GENERATION_MAX_RETRIES", 5))
+    GENERATION_BACKOFF_SECONDS = float(os.getenv("GENERATION_BACKOFF_SECONDS", 2.0))
+    
+    # Profiling (opt-in; see profiler.py)
+    PROFILE_ENABLED = os.getenv("PROFILE", "false").lower() in ("1", "true", "yes")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.01))  # Fraction of calls profiled; main.py --profile profiles every call
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 10))  # Stack sampling interval
+    PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "false").lower() in ("1", "true", "yes")  # Slows allocation-heavy code several times over
+    PROFILE_CPROFILE = os.getenv("PROFILE_CPROFILE", "false").lower() in ("1", "true", "yes")  # Deterministic, higher overhead
+    
     # Default document path
     DEFAULT_DOCUMENT_PATH = "data/answers_to_developer_questions.pdf"
     
@@ -1,25 +1,181 @@
 
+import hashlib
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
 from typing import List, Tuple
-from docling.document_converter import DocumentConverter
+from docling.datamodel.base_models import ConversionStatus, FormatToExtensions, InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.chunking import HybridChunker
+from docling_core.types.doc import DoclingDocument
 from fastembed import TextEmbedding
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+CONVERSION_PROFILES = ("accurate", "fast")
+# PARTIAL_SUCCESS (e.g. one unreadable page) is still usable, as in Docling's own raises_on_error
+USABLE_STATUSES = (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS)
+SUPPORTED_EXTENSIONS = {ext.lower() for extensions in FormatToExtensions.values() for ext in extensions}
+
+# Marks arguments the caller did not pass, so an explicit None can mean "library default"
+_CONFIG_DEFAULT = object()
+
+# Per-process converter for conversion worker processes
+_worker_converter = None
+
+
+def build_converter(conversion_profile: str) -> DocumentConverter:
+    """
+    Build a Docling converter for a conversion profile.
+    
+    Args:
+        conversion_profile (str): "accurate" or "fast"
+        
+    Returns:
+        DocumentConverter: Converter to reuse across documents
+    """
+    if conversion_profile == "fast":
+        # Text-native PDFs don't need OCR or table structure recognition
+        pipeline_options = PdfPipelineOptions(do_ocr=False, do_table_structure=False)
+        return DocumentConverter(
+            format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+        )
+    return DocumentConverter()
+
+
+def _init_conversion_worker(conversion_profile: str):
+    """Create the converter once per worker process."""
+    global _worker_converter
+    _worker_converter = build_converter(conversion_profile)
+
+
+def _convert_in_worker(file_path: str) -> Tuple[bool, object]:
+    """Convert one file in a worker process, returning the document as a dict or the error."""
+    try:
+        result = _worker_converter.convert(source=file_path, raises_on_error=False)
+    except Exception as e:
+        return False, str(e)
+    if result.status not in USABLE_STATUSES:
+        return False, f"status {result.status}: {result.errors}"
+    if result.status == ConversionStatus.PARTIAL_SUCCESS:
+        logger.warning(f"Partially converted {file_path}: {result.errors}")
+    return True, result.document.export_to_dict()
+
+
+def create_embedding_model(model_name: str = None, threads=_CONFIG_DEFAULT, providers=_CONFIG_DEFAULT) -> TextEmbedding:
+    """
+    Create a fastembed model with the configured ONNX runtime settings.
+    
+    Args:
+        model_name (str, optional): fastembed model name. Defaults to Config.EMBEDDING_MODEL.
+        threads (int, optional): ONNX intra-op threads, None for the onnxruntime default.
+            Defaults to Config.EMBEDDING_THREADS when not passed.
+        providers (List[str], optional): ONNX execution providers, None for the onnxruntime default.
+            Defaults to Config.EMBEDDING_PROVIDERS when not passed.
+        
+    Returns:
+        TextEmbedding: Embedding model
+    """
+    return TextEmbedding(
+        model_name=model_name or Config.EMBEDDING_MODEL,
+        threads=Config.EMBEDDING_THREADS if threads is _CONFIG_DEFAULT else threads,
+        providers=Config.EMBEDDING_PROVIDERS if providers is _CONFIG_DEFAULT else providers
+    )
+
 class DocumentProcessor:
     """Handles document loading, chunking, and embedding."""
     
-    def __init__(self):
-        """Initialize the document processor."""
-        self.embedding_model = TextEmbedding(model_name=Config.EMBEDDING_MODEL)
+    def __init__(self, conversion_profile: str = None, cache_dir: str = None):
+        """
+        Initialize the document processor.
+        
+        Args:
+            conversion_profile (str, optional): "accurate" or "fast". Defaults to Config.CONVERSION_PROFILE.
+            cache_dir (str, optional): Directory for converted documents. Defaults to Config.DOCLING_CACHE_DIR.
+        """
+        self.conversion_profile = conversion_profile or Config.CONVERSION_PROFILE
+        if self.conversion_profile not in CONVERSION_PROFILES:
+            raise ValueError(f"Unknown conversion profile '{self.conversion_profile}', expected one of {CONVERSION_PROFILES}")
+        cache_dir = Config.DOCLING_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        
+        # Created once so Docling's layout/OCR models are only initialized on first use
+        self.converter = build_converter(self.conversion_profile)
+        self.embedding_model = create_embedding_model()
         self.chunker = HybridChunker(tokenizer=Config.CHUNK_TOKENIZER)
-        logger.info(f"Initialized DocumentProcessor with embedding model: {Config.EMBEDDING_MODEL}")
+        logger.info(
+            f"Initialized DocumentProcessor with embedding model: {Config.EMBEDDING_MODEL} "
+            f"(threads={Config.EMBEDDING_THREADS}, batch_size={Config.EMBEDDING_BATCH_SIZE}, parallel={Config.EMBEDDING_PARALLEL}), "
+            f"conversion profile: {self.conversion_profile}"
+        )
+    
+    @staticmethod
+    def is_supported(file_path: str) -> bool:
+        """
+        Check whether Docling can convert a file, judging by its extension.
+        
+        Args:
+            file_path (str): Path to the document file
+            
+        Returns:
+            bool: True if the extension is a Docling input format
+        """
+        return Path(file_path).suffix.lower().lstrip(".") in SUPPORTED_EXTENSIONS
+    
+    def _cache_path(self, file_path: str) -> Path:
+        """
+        Get the cache file for a document, keyed by content hash and conversion settings.
+        
+        Args:
+            file_path (str): Path to the document file
+            
+        Returns:
+            Path: Cache file path, or None if caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        try:
+            docling_version = version("docling")
+        except PackageNotFoundError:
+            docling_version = "unknown"
+        return self.cache_dir / f"{digest.hexdigest()}_{self.conversion_profile}_{docling_version}.json"
+    
+    def _load_cached(self, cache_path: Path):
+        """Load a converted document from the cache, or return None on a miss."""
+        if cache_path is None or not cache_path.exists():
+            return None
+        try:
+            document = DoclingDocument.load_from_json(cache_path)
+            logger.info(f"Loaded converted document from cache: {cache_path}")
+            return document
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {cache_path}: {e}")
+            return None
+    
+    def _save_cached(self, cache_path: Path, document):
+        """Store a converted document in the cache."""
+        if cache_path is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so an interrupted save never leaves a truncated entry
+            tmp_path = cache_path.with_suffix(".tmp")
+            document.save_as_json(tmp_path)
+            tmp_path.replace(cache_path)
+        except Exception as e:
+            logger.warning(f"Could not cache converted document: {e}")
     
     def load_document(self, file_path: str):
         """
-        Load and convert a document using Docling.
+        Load and convert a document using Docling, reusing a cached conversion when available.
         
         Args:
             file_path (str): Path to the document file
@@ -29,14 +185,136 @@ class DocumentProcessor:
         """
         try:
             logger.info(f"Loading document from: {file_path}")
-            converter = DocumentConverter()
-            result = converter.convert(source=file_path)
+            cache_path = self._cache_path(file_path)
+            document = self._load_cached(cache_path)
+            if document is not None:
+                return document
+            result = self.converter.convert(source=file_path)
+            self._save_cached(cache_path, result.document)
             logger.info("Document loaded successfully")
             return result.document
         except Exception as e:
             logger.error(f"Error loading document: {e}")
             raise
     
+    def _convert_in_workers(self, file_paths: List[str], workers: int) -> Tuple[list, List[int]]:
+        """
+        Convert files in a pool of worker processes, one future per file.
+        
+        Args:
+            file_paths (List[str]): Paths to the document files
+            workers (int): Number of worker processes
+            
+        Returns:
+            Tuple[list, List[int]]: Documents in input order (None for failures), and the
+                indices whose futures failed because a worker process died
+        """
+        documents = [None] * len(file_paths)
+        broken = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_conversion_worker,
+            initargs=(self.conversion_profile,)
+        ) as pool:
+            futures = [pool.submit(_convert_in_worker, file_path) for file_path in file_paths]
+            for i, (file_path, future) in enumerate(zip(file_paths, futures)):
+                try:
+                    ok, payload = future.result()
+                except BrokenProcessPool:
+                    broken.append(i)
+                    continue
+                except Exception as e:
+                    logger.warning(f"Skipping {file_path}: conversion failed ({e})")
+                    continue
+                if ok:
+                    documents[i] = DoclingDocument.model_validate(payload)
+                else:
+                    logger.warning(f"Skipping {file_path}: conversion failed ({payload})")
+        return documents, broken
+    
+    def _convert_misses(self, file_paths: List[str]) -> list:
+        """
+        Convert uncached files, in parallel worker processes when CONVERSION_WORKERS > 1.
+        
+        Args:
+            file_paths (List[str]): Paths to the document files
+            
+        Returns:
+            list: Converted documents in input order, None for files that failed
+        """
+        if Config.CONVERSION_WORKERS > 1 and len(file_paths) > 1:
+            workers = min(Config.CONVERSION_WORKERS, len(file_paths))
+            logger.info(f"Converting {len(file_paths)} documents in {workers} worker processes")
+            documents, broken = self._convert_in_workers(file_paths, workers)
+            if broken:
+                # A dying worker (e.g. OOM) fails every pending future; retry each of those files
+                # alone so only the file that actually kills its worker is skipped
+                logger.warning(f"A conversion worker died; retrying {len(broken)} documents one per worker")
+                for i in broken:
+                    retried, still_broken = self._convert_in_workers([file_paths[i]], 1)
+                    if still_broken:
+                        logger.warning(f"Skipping {file_paths[i]}: conversion worker died")
+                    documents[i] = retried[0]
+            return documents
+        
+        documents = []
+        # Converted one by one so every failure stays attributable to its input file
+        for file_path in file_paths:
+            try:
+                result = self.converter.convert(source=file_path, raises_on_error=False)
+            except Exception as e:
+                logger.warning(f"Skipping {file_path}: conversion failed ({e})")
+                documents.append(None)
+                continue
+            if result.status in USABLE_STATUSES:
+                if result.status == ConversionStatus.PARTIAL_SUCCESS:
+                    logger.warning(f"Partially converted {file_path}: {result.errors}")
+                documents.append(result.document)
+            else:
+                logger.warning(f"Skipping {file_path}: conversion status {result.status} {result.errors}")
+                documents.append(None)
+        return documents
+    
+    def load_documents(self, file_paths: List[str]) -> list:
+        """
+        Load and convert several documents, skipping files that fail to convert.
+        
+        Args:
+            file_paths (List[str]): Paths to the document files
+            
+        Returns:
+            list: (file_path, document) pairs in input order, without failed files
+        """
+        try:
+            logger.info(f"Loading {len(file_paths)} documents")
+            readable = []
+            cache_paths = []
+            for file_path in file_paths:
+                try:
+                    cache_paths.append(self._cache_path(file_path))
+                    readable.append(file_path)
+                except OSError as e:
+                    logger.warning(f"Skipping {file_path}: cannot read file ({e})")
+            requested = len(file_paths)
+            file_paths = readable
+            documents = [self._load_cached(cache_path) for cache_path in cache_paths]
+            
+            misses = [i for i, document in enumerate(documents) if document is None]
+            if misses:
+                logger.info(f"Converting {len(misses)} uncached documents")
+                converted = self._convert_misses([file_paths[i] for i in misses])
+                for i, document in zip(misses, converted):
+                    if document is not None:
+                        documents[i] = document
+                        self._save_cached(cache_paths[i], document)
+            
+            loaded = [(file_path, document) for file_path, document in zip(file_paths, documents) if document is not None]
+            logger.info(f"Loaded {len(loaded)} of {requested} documents")
+            return loaded
+        except Exception as e:
+            logger.error(f"Error loading documents: {e}")
+            raise
+    
     def chunk_document(self, document) -> List[str]:
         """
         Chunk the document into smaller pieces.
@@ -69,7 +347,11 @@ class DocumentProcessor:
         """
         try:
             logger.info(f"Generating embeddings for {len(text_chunks)} chunks")
-            embeddings = list(self.embedding_model.embed(text_chunks))
+            embeddings = list(self.embedding_model.embed(
+                text_chunks,
+                batch_size=Config.EMBEDDING_BATCH_SIZE,
+                parallel=Config.EMBEDDING_PARALLEL
+            ))
             logger.info(f"Generated {len(embeddings)} embeddings")
             return embeddings
         except Exception as e:
@@ -92,6 +374,27 @@ class DocumentProcessor:
         
         return text_chunks, embeddings
     
+    def process_documents(self, file_paths: List[str]) -> Tuple[List[str], List[List[float]], List[str]]:
+        """
+        Document processing pipeline for several files.
+        
+        Args:
+            file_paths (List[str]): Paths to the document files
+            
+        Returns:
+            Tuple[List[str], List[List[float]], List[str]]: Text chunks of all files, their
+                embeddings, and the file each chunk came from
+        """
+        text_chunks = []
+        sources = []
+        for file_path, document in self.load_documents(file_paths):
+            chunks = self.chunk_document(document)
+            text_chunks.extend(chunks)
+            sources.extend([file_path] * len(chunks))
+        embeddings = self.generate_embeddings(text_chunks)
+        
+        return text_chunks, embeddings, sources
+    
     def embed_query(self, query_text: str) -> List[float]:
         """
         Generate embedding for a query.
@@ -107,4 +410,21 @@ class DocumentProcessor:
             return embedding
         except Exception as e:
             logger.error(f"Error embedding query: {e}")
+            raise
+
+    def embed_queries(self, query_texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many queries in a single pass.
+
+        Args:
+            query_texts (List[str]): Query texts
+
+        Returns:
+            List[List[float]]: Query embedding vectors, in input order
+        """
+        try:
+            logger.info(f"Embedding {len(query_texts)} queries")
+            return list(self.embedding_model.embed(query_texts, batch_size=Config.EMBEDDING_BATCH_SIZE))
+        except Exception as e:
+            logger.error(f"Error embedding queries: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,103 @@
+import argparse
+import itertools
+import logging
+import time
+from typing import Any, Dict, List
+from config import Config
+from document_processor import DocumentProcessor, create_embedding_model
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SAMPLE_TEXT = (
+    "Retrieval-augmented generation combines a vector search over document chunks "
+    "with a language model that answers using the retrieved context."
+)
+
+def load_texts(document: str = None, count: int = 1000) -> List[str]:
+    """
+    Get benchmark texts, either chunks of a real document or synthetic passages.
+
+    Args:
+        document (str, optional): Document to chunk for realistic inputs
+        count (int): Number of texts to return
+
+    Returns:
+        List[str]: Benchmark texts
+    """
+    if document:
+        processor = DocumentProcessor()
+        chunks = processor.chunk_document(processor.load_document(document))
+    else:
+        chunks = [f"{i}: {SAMPLE_TEXT}" for i in range(count)]
+    # Repeat chunks so every setting embeds the same number of texts
+    return list(itertools.islice(itertools.cycle(chunks), count))
+
+def benchmark(texts: List[str], model_name: str, threads: int, batch_size: int, parallel: int) -> Dict[str, Any]:
+    """
+    Measure embedding throughput for one runtime setting.
+
+    Args:
+        texts (List[str]): Texts to embed
+        model_name (str): fastembed model name
+        threads (int): ONNX intra-op threads, None for the onnxruntime default
+        batch_size (int): Texts per inference call
+        parallel (int): Data-parallel workers, None to disable
+
+    Returns:
+        Dict[str, Any]: Setting and measured vectors/s
+    """
+    model = create_embedding_model(model_name=model_name, threads=threads)
+    # Warm up so session creation and first-call allocation are not timed
+    list(model.embed(texts[:batch_size], batch_size=batch_size))
+
+    start = time.perf_counter()
+    count = sum(1 for _ in model.embed(texts, batch_size=batch_size, parallel=parallel))
+    elapsed = time.perf_counter() - start
+    return {
+        "model": model_name,
+        "threads": threads,
+        "batch_size": batch_size,
+        "parallel": parallel,
+        "vectors": count,
+        "seconds": round(elapsed, 3),
+        "vectors_per_s": round(count / elapsed, 1) if count and elapsed > 0 else 0.0
+    }
+
+def parse_optional_ints(values: List[str]) -> List[int]:
+    """Parse integers where "none" stands for the library default."""
+    return [None if v.lower() == "none" else int(v) for v in values]
+
+def main():
+    """Run the embedding benchmark over every combination of the given settings."""
+    parser = argparse.ArgumentParser(description="Benchmark fastembed throughput for different runtime settings")
+    parser.add_argument("--models", nargs="+", default=[Config.EMBEDDING_MODEL], help="fastembed model names, e.g. quantized variants")
+    parser.add_argument("--threads", nargs="+", default=[str(Config.EMBEDDING_THREADS)], help="ONNX thread counts ('none' for default)")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[Config.EMBEDDING_BATCH_SIZE], help="Texts per inference call")
+    parser.add_argument("--parallel", nargs="+", default=[str(Config.EMBEDDING_PARALLEL)], help="Data-parallel workers ('none' to disable, 0 for all cores)")
+    parser.add_argument("--count", type=int, default=1000, help="Number of texts to embed per setting")
+    parser.add_argument("--document", "-d", help="Chunk this document for benchmark texts instead of synthetic ones")
+    args = parser.parse_args()
+
+    texts = load_texts(args.document, args.count)
+    if not texts:
+        print("❌ No benchmark texts: the document produced no chunks")
+        return
+    settings = itertools.product(
+        args.models,
+        parse_optional_ints(args.threads),
+        args.batch_sizes,
+        parse_optional_ints(args.parallel)
+    )
+
+    print(f"{'model':<40} {'threads':>8} {'batch':>6} {'parallel':>9} {'vectors/s':>10}")
+    for model_name, threads, batch_size, parallel in settings:
+        result = benchmark(texts, model_name, threads, batch_size, parallel)
+        print(f"{result['model']:<40} {str(result['threads']):>8} {result['batch_size']:>6} "
+              f"{str(result['parallel']):>9} {result['vectors_per_s']:>10}")
+
+if __name__ == "__main__":
+    main()
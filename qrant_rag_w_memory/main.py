@@ -5,6 +5,7 @@ import sys
 import os
 from pathlib import Path
 from chatbot import RAGChatbot
+from batch_runner import BatchRunner
 from config import Config
 
 
@@ -32,6 +33,7 @@ def interactive_mode(chatbot: RAGChatbot):
     print("\\n RAG Chatbot is ready! Type 'quit', 'exit', or 'q' to exit.")
     print("Commands:")
     print("  status - Show chatbot status")
+    print("  /corpus <id>[,<id>...] - Select the corpora to search")
     print("  help - Show this help message")
     print("-" * 50)
     
@@ -49,9 +51,15 @@ def interactive_mode(chatbot: RAGChatbot):
                 status = chatbot.get_status()
                 print(f"\\n Status: {status}")
                 continue
+            elif query.lower().startswith('/corpus '):
+                corpus_ids = [c.strip() for c in query[len('/corpus '):].split(',') if c.strip()]
+                chatbot.set_corpora(corpus_ids)
+                print(f"\\n Searching corpora: {', '.join(chatbot.corpus_ids)}")
+                continue
             elif query.lower() == 'help':
                 print("\\n Available commands:")
                 print("  status - Show chatbot status")
+                print("  /corpus <id>[,<id>...] - Select the corpora to search")
                 print("  help - Show this help message")
                 print("  quit/exit/q - Exit the chatbot")
                 continue
@@ -76,13 +84,27 @@ def single_query_mode(chatbot: RAGChatbot, query: str):
         print(f"Error: {e}")
         sys.exit(1)
 
+def batch_mode(chatbot: RAGChatbot, batch_file: str, output_file: str = None, concurrency: int = None):
+    """Run all queries from a JSONL file and write results to a JSONL file."""
+    batch_path = Path(batch_file)
+    if not batch_path.exists():
+        print(f"❌ Batch file not found: {batch_file}")
+        sys.exit(1)
+    
+    output_path = Path(output_file) if output_file else batch_path.with_name(f"{batch_path.stem}_results.jsonl")
+    print(f" Running batch queries: {batch_path} -> {output_path}")
+    summary = BatchRunner(chatbot, concurrency=concurrency).run(str(batch_path), str(output_path))
+    print(f"✅ Batch finished: {summary['succeeded']}/{summary['total']} succeeded in {summary['elapsed_s']}s")
+    if summary["failed"]:
+        sys.exit(1)
+
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="RAG Chatbot with Qdrant, Gemma3, and Docling")
     parser.add_argument(
         "--document", 
         "-d", 
-        help="Path to document to load", 
+        help="Path to document (or directory of documents) to load", 
         default=Config.DEFAULT_DOCUMENT_PATH
     )
     parser.add_argument(
@@ -90,12 +112,43 @@ def main():
         "-q", 
         help="Single query to run (non-interactive mode)"
     )
+    parser.add_argument(
+        "--corpus",
+        "-c",
+        nargs="+",
+        help=f"Corpus IDs to search; documents are indexed into the first one (default: {Config.DEFAULT_CORPUS})"
+    )
+    parser.add_argument(
+        "--conversion-profile",
+        choices=["accurate", "fast"],
+        help=f"Docling conversion profile; 'fast' skips OCR and table structure for text-native PDFs (default: {Config.CONVERSION_PROFILE})"
+    )
+    parser.add_argument(
+        "--batch-file",
+        "-b",
+        help="JSONL file of queries to run in batch mode (one {\"id\": ..., \"query\": ...} per line)"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="JSONL file for batch results (defaults to <batch-file>_results.jsonl)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help=f"Concurrent generation requests in batch mode (default: {Config.BATCH_CONCURRENCY})"
+    )
     parser.add_argument(
         "--verbose", 
         "-v", 
         action="store_true", 
         help="Enable verbose logging"
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Profile every chat turn and document load, writing reports to {Config.PROFILE_DIR}/ (PROFILE=true profiles a PROFILE_SAMPLE_RATE fraction)"
+    )
     parser.add_argument(
         "--setup", 
         action="store_true", 
@@ -107,6 +160,10 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if args.profile:
+        Config.PROFILE_ENABLED = True
+        Config.PROFILE_SAMPLE_RATE = 1.0
+    
     if args.setup:
         setup_environment()
         return
@@ -117,7 +174,7 @@ def main():
     try:
         # Initialize chatbot
         print("🚀 Initializing RAG Chatbot...")
-        chatbot = RAGChatbot()
+        chatbot = RAGChatbot(conversion_profile=args.conversion_profile, corpus_ids=args.corpus)
         
         document_path = Path(args.document)
         if not document_path.exists():
@@ -132,7 +189,9 @@ def main():
         status = chatbot.get_status()
         print(f"✅ Chatbot ready! Collection has {status.get('collection', {}).get('vectors_count', 0)} documents")
         
-        if args.query:
+        if args.batch_file:
+            batch_mode(chatbot, args.batch_file, args.output, args.concurrency)
+        elif args.query:
             single_query_mode(chatbot, args.query)
         else:
             interactive_mode(chatbot)
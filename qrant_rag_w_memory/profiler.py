@@ -0,0 +1,188 @@
+import cProfile
+import functools
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Only one call is profiled at a time; concurrent or nested calls run unprofiled
+_profile_lock = threading.Lock()
+_run_counter = itertools.count()
+
+class StackSampler:
+    """Samples the call stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval_ms: float):
+        """
+        Initialize the sampler.
+
+        Args:
+            thread_id (int): Ident of the thread to sample
+            interval_ms (float): Sampling interval in milliseconds
+        """
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        """Start sampling in a background thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the background thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Get samples in collapsed-stack format, as read by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit: int = 25) -> List[str]:
+        """
+        Summarize where samples landed.
+
+        Args:
+            limit (int): Number of functions to list
+
+        Returns:
+            List[str]: Report lines with self and total sample share per function
+        """
+        total = sum(self.stacks.values())
+        if not total:
+            return ["  no samples collected (call shorter than the sampling interval)"]
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        lines = [f"  {'self %':>7} {'total %':>8}  function"]
+        for frame, count in self_counts.most_common(limit):
+            lines.append(f"  {100 * count / total:>6.1f}% {100 * total_counts[frame] / total:>7.1f}%  {frame}")
+        return lines
+
+def _write_report(name: str, elapsed: float, sampler: StackSampler, profile: cProfile.Profile, snapshot, peak: int):
+    """Write the collapsed stacks, the text report and optionally the cProfile dump for one run."""
+    output_dir = Path(Config.PROFILE_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = output_dir / f"{name}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{next(_run_counter)}"
+
+    stem.with_suffix(".collapsed").write_text(sampler.collapsed(), encoding="utf-8")
+
+    instrumentation = ["stack sampling"]
+    if snapshot is not None:
+        instrumentation.append("tracemalloc")
+    if profile is not None:
+        instrumentation.append("cProfile")
+    lines = [
+        f"Profile of {name}",
+        f"Wall time: {elapsed * 1000:.1f} ms (includes overhead of {', '.join(instrumentation)})",
+        f"Stack samples: {sum(sampler.stacks.values())} at {Config.PROFILE_INTERVAL_MS} ms interval",
+        "",
+        "Sampled wall time by function:",
+        *sampler.top_functions(),
+    ]
+    if snapshot is not None:
+        # The profiler's own bookkeeping (e.g. the sampler's stack counter) is not part of the call
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        lines += [
+            "",
+            f"Peak traced memory during call: {peak / 1024:.1f} KiB",
+            "Allocations still alive at exit (retained, not temporary churn), by line:",
+        ]
+        lines += [f"  {stat}" for stat in snapshot.statistics("lineno")[:20]]
+    if profile is not None:
+        profile.dump_stats(str(stem.with_suffix(".prof")))
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(30)
+        lines += ["", "cProfile (cumulative):", stream.getvalue()]
+
+    stem.with_suffix(".txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    logger.info(f"Wrote profile of {name} ({elapsed * 1000:.1f} ms) to {stem}.*")
+
+def profiled(name: str) -> Callable:
+    """
+    Decorate a function so that, when profiling is enabled, a sample of its calls is profiled.
+
+    Each profiled call writes <name>_<time>_<pid>_<n>.collapsed (stack samples),
+    .txt (report with top functions and, with PROFILE_TRACEMALLOC, retained
+    allocations) and, with PROFILE_CPROFILE, .prof (cProfile dump) into
+    Config.PROFILE_DIR.
+
+    Args:
+        name (str): Label used in report file names
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Config.PROFILE_ENABLED or random.random() >= Config.PROFILE_SAMPLE_RATE:
+                return func(*args, **kwargs)
+            if not _profile_lock.acquire(blocking=False):
+                return func(*args, **kwargs)
+
+            try:
+                sampler = StackSampler(threading.get_ident(), Config.PROFILE_INTERVAL_MS)
+                profile = cProfile.Profile() if Config.PROFILE_CPROFILE else None
+                # Leave tracing alone if something else already started it
+                trace_allocations = Config.PROFILE_TRACEMALLOC and not tracemalloc.is_tracing()
+
+                # Timed from before any instrumentation starts; the report names what was active
+                start = time.perf_counter()
+                if trace_allocations:
+                    tracemalloc.start()
+                sampler.start()
+                if profile is not None:
+                    profile.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    if profile is not None:
+                        profile.disable()
+                    sampler.stop()
+                    snapshot, peak = None, 0
+                    if trace_allocations:
+                        snapshot = tracemalloc.take_snapshot()
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                    try:
+                        _write_report(name, elapsed, sampler, profile, snapshot, peak)
+                    except Exception as e:
+                        logger.warning(f"Could not write profile of {name}: {e}")
+            finally:
+                _profile_lock.release()
+        return wrapper
+    return decorator
@@ -0,0 +1,50 @@
+import logging
+import random
+import time
+from typing import Callable, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def call_with_retry(
+    func: Callable[[], T],
+    retry_on: Tuple[Type[BaseException], ...],
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    description: str = "call",
+    retry_if: Optional[Callable[[BaseException], bool]] = None,
+) -> T:
+    """
+    Call a function, retrying transient failures with exponential backoff.
+
+    Args:
+        func (Callable[[], T]): Zero-argument callable to invoke
+        retry_on (Tuple[Type[BaseException], ...]): Exception types considered transient
+        max_retries (int): Number of retries after the first attempt
+        base_delay (float): Delay in seconds before the first retry
+        max_delay (float): Upper bound for a single delay in seconds
+        description (str): Label used in log messages
+        retry_if (Callable[[BaseException], bool], optional): Further narrows which
+            retry_on errors are transient, e.g. by status code
+
+    Returns:
+        T: Return value of func
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except retry_on as e:
+            if retry_if is not None and not retry_if(e):
+                raise
+            if attempt >= max_retries:
+                logger.error(f"{description} failed after {attempt + 1} attempts: {e}")
+                raise
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            attempt += 1
+            logger.warning(f"{description} failed ({e}), retry {attempt}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
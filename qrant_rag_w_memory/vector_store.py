@@ -1,26 +1,117 @@
 import logging
-from typing import List, Dict, Any
+import threading
+import uuid
+from typing import List, Dict, Any, Callable, Optional, TypeVar
+import grpc
 from qdrant_client import QdrantClient, models
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 from config import Config
+from retry_utils import call_with_retry
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Clients are shared per connection settings so the doc and memory stores reuse one connection pool
+_clients: Dict[tuple, QdrantClient] = {}
+_clients_lock = threading.Lock()
+
+# (url, collection_name) pairs known to exist, so writes skip the existence round trip
+_known_collections = set()
+
+RETRYABLE_QDRANT_ERRORS = (ResponseHandlingException, UnexpectedResponse, grpc.RpcError)
+RETRYABLE_HTTP_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_GRPC_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+}
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Tell whether a Qdrant error is worth retrying."""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in RETRYABLE_HTTP_STATUS
+    if isinstance(error, grpc.RpcError):
+        return error.code() in RETRYABLE_GRPC_CODES
+    # Connection errors and timeouts surface as ResponseHandlingException
+    return True
+
+
+def _is_already_exists(error: BaseException) -> bool:
+    """Tell whether a Qdrant error means the resource already exists (HTTP 409 / gRPC ALREADY_EXISTS)."""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 409
+    if isinstance(error, grpc.RpcError):
+        return error.code() == grpc.StatusCode.ALREADY_EXISTS
+    return False
+
+
+def _is_not_found(error: BaseException) -> bool:
+    """Tell whether a Qdrant error means the collection does not exist (HTTP 404 / gRPC NOT_FOUND)."""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 404
+    if isinstance(error, grpc.RpcError):
+        return error.code() == grpc.StatusCode.NOT_FOUND
+    return False
+
+
+def get_client(url: str, api_key: str = None, prefer_grpc: bool = None, timeout: int = None) -> QdrantClient:
+    """
+    Get a shared Qdrant client for the given connection settings.
+    
+    Args:
+        url (str): Qdrant URL
+        api_key (str, optional): Qdrant API key
+        prefer_grpc (bool, optional): Use gRPC transport. Defaults to Config.QDRANT_PREFER_GRPC.
+        timeout (int, optional): Request timeout in seconds. Defaults to Config.QDRANT_TIMEOUT.
+        
+    Returns:
+        QdrantClient: Client reused by every store with the same settings
+    """
+    prefer_grpc = Config.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc
+    timeout = timeout or Config.QDRANT_TIMEOUT
+    key = (url, api_key, prefer_grpc, timeout)
+    with _clients_lock:
+        if key not in _clients:
+            logger.info(f"Creating Qdrant client for {url} (prefer_grpc={prefer_grpc}, timeout={timeout}s)")
+            _clients[key] = QdrantClient(url, api_key=api_key, prefer_grpc=prefer_grpc, timeout=timeout)
+        return _clients[key]
+
 class VectorStore:
     """Handles vector storage and retrieval using Qdrant."""
     
-    def __init__(self, url: str = None , api_key: str = None , collection_name: str = None):
+    def __init__(self, url: str = None , api_key: str = None , collection_name: str = None, prefer_grpc: bool = None, tenant_field: str = None, source_field: str = None):
         """
         Initialize the vector store.
         
         Args:
             url (str, optional): Qdrant URL. Defaults to Config.QDRANT_URL.
+            prefer_grpc (bool, optional): Use gRPC transport. Defaults to Config.QDRANT_PREFER_GRPC.
+            tenant_field (str, optional): Payload field partitioning the collection by tenant.
+                When set, points are tagged with it and searches are scoped by it.
+            source_field (str, optional): Payload field naming the document a point came from.
+                When set, adding documents replaces the tenant's earlier points from the same sources.
         """
         self.url = url or Config.QDRANT_URL
         self.api_key = api_key or Config.QDRANT_API_KEY
-        self.client = QdrantClient(self.url,api_key=self.api_key)
+        self.client = get_client(self.url, api_key=self.api_key, prefer_grpc=prefer_grpc)
         self.collection_name = collection_name or Config.COLLECTION_NAME
+        self.tenant_field = tenant_field
+        self.source_field = source_field
         logger.info(f"Initialized VectorStore with URL: {self.url} ,collection: {self.collection_name}")
     
+    def _call(self, description: str, func: Callable[[], T]) -> T:
+        """Run a Qdrant request, retrying transient failures with exponential backoff."""
+        return call_with_retry(
+            func,
+            retry_on=RETRYABLE_QDRANT_ERRORS,
+            retry_if=_is_transient,
+            max_retries=Config.QDRANT_MAX_RETRIES,
+            base_delay=Config.QDRANT_BACKOFF_SECONDS,
+            description=f"Qdrant {description} on '{self.collection_name}'",
+        )
+    
     def create_collection(self, embedding_dim: int):
         """
         Create a collection in Qdrant.
@@ -29,33 +120,131 @@ class VectorStore:
             embedding_dim (int): Dimension of the embedding vectors
         """
         try:
-            collections = self.client.get_collections().collections
-            collection_names = [col.name for col in collections]
+            cache_key = (self.url, self.collection_name)
+            if cache_key in _known_collections:
+                return
             
-            if self.collection_name in collection_names:
+            existed = self._call("collection_exists", lambda: self.client.collection_exists(self.collection_name))
+            if existed:
                 logger.info(f"Collection '{self.collection_name}' already exists")
-                return
+            else:
+                logger.info(f"Creating collection '{self.collection_name}' with dimension {embedding_dim}")
+                # Searches are always scoped to tenants, so build per-tenant HNSW graphs instead of a global one
+                hnsw_config = models.HnswConfigDiff(payload_m=16, m=0) if self.tenant_field else None
+                try:
+                    self._call("create_collection", lambda: self.client.create_collection(
+                        collection_name=self.collection_name,
+                        vectors_config=models.VectorParams(
+                            size=embedding_dim,
+                            distance=models.Distance.COSINE
+                        ),
+                        hnsw_config=hnsw_config
+                    ))
+                    logger.info("Collection created successfully")
+                except (UnexpectedResponse, grpc.RpcError) as e:
+                    # A retried create whose first attempt timed out but succeeded, or a concurrent creator
+                    if not _is_already_exists(e):
+                        raise
+                    logger.info(f"Collection '{self.collection_name}' already exists")
             
-            logger.info(f"Creating collection '{self.collection_name}' with dimension {embedding_dim}")
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=models.VectorParams(
-                    size=embedding_dim,
-                    distance=models.Distance.COSINE
-                )
-            )
-            logger.info("Collection created successfully")
+            if self.tenant_field:
+                # A collection from before tenancy may hold points no tenant filter can ever match
+                legacy = existed and self.tenant_field not in self._call(
+                    "get_collection", lambda: self.client.get_collection(self.collection_name)
+                ).payload_schema
+                self._create_tenant_index()
+                if legacy:
+                    self._delete_untenanted()
+            if self.source_field:
+                self._call("create_payload_index", lambda: self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=self.source_field,
+                    field_schema=models.PayloadSchemaType.KEYWORD
+                ))
+            _known_collections.add(cache_key)
         except Exception as e:
             logger.error(f"Error creating collection: {e}")
             raise
     
-    def add_documents(self, text_chunks: List[str], embeddings: List[List[float]], metas: List[dict] = None ):
+    def _with_collection(self, embedding_dim: int, func: Callable[[], T]) -> T:
+        """
+        Run a request against the collection, recreating it once if it has disappeared.
+        
+        _known_collections is never refreshed, so a collection deleted by another
+        process or client would otherwise fail every later request.
+        
+        Args:
+            embedding_dim (int): Dimension of the embedding vectors, used if the collection is recreated
+            func (Callable[[], T]): Request to run
+            
+        Returns:
+            T: Result of the request
+        """
+        try:
+            return func()
+        except (UnexpectedResponse, grpc.RpcError) as e:
+            if not _is_not_found(e):
+                raise
+            logger.warning(f"Collection '{self.collection_name}' not found, recreating it")
+            _known_collections.discard((self.url, self.collection_name))
+            self.create_collection(embedding_dim)
+            return func()
+    
+    def _create_tenant_index(self):
+        """Index the tenant field so Qdrant co-locates and partitions each tenant's points."""
+        # Creating an index that already exists with the same schema is a no-op
+        self._call("create_payload_index", lambda: self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name=self.tenant_field,
+            field_schema=models.KeywordIndexParams(
+                type=models.KeywordIndexType.KEYWORD,
+                is_tenant=True
+            )
+        ))
+    
+    def _delete_untenanted(self):
+        """Delete points without a tenant, left over from before the collection was partitioned."""
+        untenanted = models.Filter(must=[
+            models.IsEmptyCondition(is_empty=models.PayloadField(key=self.tenant_field))
+        ])
+        count = self._call("count", lambda: self.client.count(
+            collection_name=self.collection_name,
+            count_filter=untenanted,
+            exact=True
+        )).count
+        if not count:
+            return
+        logger.warning(
+            f"Deleting {count} points without '{self.tenant_field}' from '{self.collection_name}'; "
+            f"re-ingest their documents to index them into a corpus"
+        )
+        self._call("delete", lambda: self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.FilterSelector(filter=untenanted),
+            wait=True
+        ))
+    
+    def _tenant_filter(self, tenant_ids: List[str] = None) -> Optional[models.Filter]:
+        """Build the filter restricting a search to the given tenants."""
+        if not self.tenant_field:
+            return None
+        tenant_ids = tenant_ids or [Config.DEFAULT_CORPUS]
+        return models.Filter(must=[
+            models.FieldCondition(key=self.tenant_field, match=models.MatchAny(any=list(tenant_ids)))
+        ])
+    
+    def add_documents(self, text_chunks: List[str], embeddings: List[List[float]], metas: List[dict] = None, tenant_id: str = None):
         """
         Add documents to the vector store.
         
+        When source_field is set, the tenant's other points from the sources
+        named in metas are deleted once the new chunks are stored, so the new
+        chunks replace them without the documents ever going missing.
+        
         Args:
             text_chunks (List[str]): List of text chunks
             embeddings (List[List[float]]): List of embedding vectors
+            tenant_id (str, optional): Tenant the documents belong to. Defaults to Config.DEFAULT_CORPUS.
         """
         try:
             if len(text_chunks) != len(embeddings):
@@ -67,6 +256,8 @@ class VectorStore:
             if embeddings:
                 self.create_collection(len(embeddings[0]))
             
+            tenant_id = tenant_id or Config.DEFAULT_CORPUS
+            
             logger.info(f"Adding {len(text_chunks)} documents to collection")
             points = []
             for i, (text_chunk, embedding) in enumerate(zip(text_chunks, embeddings)):
@@ -74,28 +265,70 @@ class VectorStore:
                 if metas:
                     payload.update(metas[i])  # Add metadata to payload
                 
+                point_id = i
+                if self.tenant_field:
+                    payload[self.tenant_field] = tenant_id
+                    # Content-derived IDs keep tenants and sources from overwriting each other
+                    source = payload.get(self.source_field, "") if self.source_field else ""
+                    point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{tenant_id}:{source}:{text_chunk}"))
+                
                 points.append(models.PointStruct(
-                    id=i,
+                    id=point_id,
                     vector=embedding,
                     payload=payload
                 ))
-            self.client.upload_points(
-                collection_name=self.collection_name,
-                points=points
-            )
+            # upload_points retries failed batches itself
+            if points:
+                self._with_collection(len(embeddings[0]), lambda: self.client.upload_points(
+                    collection_name=self.collection_name,
+                    points=points,
+                    batch_size=Config.UPLOAD_BATCH_SIZE,
+                    parallel=Config.UPLOAD_PARALLEL,
+                    max_retries=Config.QDRANT_MAX_RETRIES,
+                    wait=True
+                ))
+            
+            if self.source_field and metas:
+                sources = sorted({meta[self.source_field] for meta in metas if self.source_field in meta})
+                if sources:
+                    self._delete_stale(tenant_id, sources, [point.id for point in points])
             logger.info("Documents added successfully")
 
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
             raise
     
-    def search(self, query_vector: List[float], limit: int = None) -> List[Dict[str, Any]]:
+    def _delete_stale(self, tenant_id: str, sources: List[str], keep_ids: List):
+        """
+        Delete a tenant's points that came from the given sources, except the ones just written.
+        
+        Args:
+            tenant_id (str): Tenant whose points are deleted
+            sources (List[str]): Source keys to delete
+            keep_ids (List): IDs of the points just written for these sources
+        """
+        logger.info(f"Removing stale points from {len(sources)} sources in tenant '{tenant_id}'")
+        conditions = [models.FieldCondition(key=self.source_field, match=models.MatchAny(any=sources))]
+        if self.tenant_field:
+            conditions.append(models.FieldCondition(key=self.tenant_field, match=models.MatchValue(value=tenant_id)))
+        # Deleting by filter is idempotent, so it is safe to retry
+        self._call("delete", lambda: self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.FilterSelector(filter=models.Filter(
+                must=conditions,
+                must_not=[models.HasIdCondition(has_id=keep_ids)]
+            )),
+            wait=True
+        ))
+    
+    def search(self, query_vector: List[float], limit: int = None, tenant_ids: List[str] = None) -> List[Dict[str, Any]]:
         """
         Search for similar documents.
         
         Args:
             query_vector (List[float]): Query embedding vector
             limit (int, optional): Number of results to return. Defaults to Config.RETRIEVAL_LIMIT.
+            tenant_ids (List[str], optional): Tenants to search in. Defaults to [Config.DEFAULT_CORPUS].
             
         Returns:
             List[Dict[str, Any]]: Search results with text and scores
@@ -104,11 +337,12 @@ class VectorStore:
             limit = limit or Config.RETRIEVAL_LIMIT
             logger.info(f"Searching for {limit} similar documents")
             
-            search_results = self.client.query_points(
+            search_results = self._with_collection(len(query_vector), lambda: self._call("query_points", lambda: self.client.query_points(
                 collection_name=self.collection_name,
                 query=query_vector,
-                limit=limit
-            )
+                limit=limit,
+                query_filter=self._tenant_filter(tenant_ids)
+            )))
             
             results = []
             for hit in search_results.points:
@@ -123,7 +357,43 @@ class VectorStore:
         except Exception as e:
             logger.error(f"Error searching documents: {e}")
             raise
-    
+
+    def search_batch(self, query_vectors: List[List[float]], limit: int = None, tenant_ids: List[str] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar documents for many queries in one request.
+
+        Args:
+            query_vectors (List[List[float]]): Query embedding vectors
+            limit (int, optional): Number of results per query. Defaults to Config.RETRIEVAL_LIMIT.
+            tenant_ids (List[str], optional): Tenants to search in. Defaults to [Config.DEFAULT_CORPUS].
+
+        Returns:
+            List[List[Dict[str, Any]]]: Search results per query, in input order
+        """
+        try:
+            limit = limit or Config.RETRIEVAL_LIMIT
+            logger.info(f"Batch searching {len(query_vectors)} queries for {limit} similar documents each")
+
+            query_filter = self._tenant_filter(tenant_ids)
+            requests = [
+                models.QueryRequest(query=query_vector, limit=limit, filter=query_filter, with_payload=True)
+                for query_vector in query_vectors
+            ]
+            if not requests:
+                return []
+            responses = self._with_collection(len(query_vectors[0]), lambda: self._call("query_batch_points", lambda: self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests
+            )))
+
+            return [
+                [{"text": hit.payload["text"], "score": hit.score, "id": hit.id} for hit in response.points]
+                for response in responses
+            ]
+        except Exception as e:
+            logger.error(f"Error batch searching documents: {e}")
+            raise
+
     def get_collection_info(self) -> Dict[str, Any]:
         """
         Get information about the collection.
@@ -132,7 +402,7 @@ class VectorStore:
             Dict[str, Any]: Collection information
         """
         try:
-            info = self.client.get_collection(self.collection_name)
+            info = self._call("get_collection", lambda: self.client.get_collection(self.collection_name))
             # Get points count from status
             points_count = None
             if hasattr(info, 'status') and hasattr(info.status, 'points_count'):
@@ -151,6 +421,7 @@ class VectorStore:
         try:
             logger.info(f"Deleting collection '{self.collection_name}'")
             self.client.delete_collection(self.collection_name)
+            _known_collections.discard((self.url, self.collection_name))
             logger.info("Collection deleted successfully")
         except Exception as e:
             logger.error(f"Error deleting collection: {e}")
@@ -158,12 +429,12 @@ class VectorStore:
     def search_with_filter(self, query_vector, limit, filters: dict):
         from qdrant_client.http.models import Filter, FieldCondition, MatchValue
         query_filter = Filter(must=[FieldCondition(key=k, match=MatchValue(value=v)) for k,v in filters.items()])
-        results = self.client.query_points(
+        results = self._with_collection(len(query_vector), lambda: self._call("query_points", lambda: self.client.query_points(
             collection_name=self.collection_name,
             query=query_vector,
             limit=limit,
             query_filter=query_filter,
-        )
+        )))
         return [
             {"id": hit.id, "score": hit.score, "text": hit.payload.get("text", ""), "metadata": hit.payload}
             for hit in results.points